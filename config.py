@@ -4,13 +4,66 @@
 """
 import os
 import json
+import atexit
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 已解析的config.json缓存：{(文件路径, mtime_ns): 配置字典}
+_CONFIG_CACHE = {}
+
 
 class Config:
-    """配置管理类"""
+    """配置管理类（单例，重复实例化不会重新读取config.json）"""
+    
+    _instance = None
+    # 环境变量缓存，避免重复查询os.environ
+    _env_cache = {}
+    
+    def __new__(cls):
+        if cls._instance is None:
+            instance = super().__new__(cls)
+            instance._initialized = False
+            cls._instance = instance
+        return cls._instance
     
     def __init__(self):
+        if self._initialized:
+            # config.json在外部被修改且内存中无未保存的改动时才重新加载
+            if not self._dirty and self._cache_key() != self._loaded_key:
+                self.config = self.load_config()
+            return
+        
+        self._initialized = True
+        self._dirty = False
         self.config_file = os.path.join(os.path.dirname(__file__), 'config.json')
+        self._loaded_key = None
         self.config = self.load_config()
+        atexit.register(self.flush)
+    
+    @classmethod
+    def _getenv(cls, name, default=''):
+        """读取环境变量（带缓存）"""
+        if name not in cls._env_cache:
+            cls._env_cache[name] = os.getenv(name, default)
+        return cls._env_cache[name]
+    
+    def _cache_key(self):
+        """返回config.json的缓存键，文件不存在时返回None"""
+        try:
+            return (self.config_file, os.stat(self.config_file).st_mtime_ns)
+        except OSError:
+            return None
+    
+    def _read_config_file(self, key):
+        """读取并解析config.json，按(路径, mtime)缓存解析结果"""
+        if key not in _CONFIG_CACHE:
+            with open(self.config_file, 'rb') as f:
+                data = f.read()
+            _CONFIG_CACHE[key] = orjson.loads(data) if orjson else json.loads(data)
+        return _CONFIG_CACHE[key]
     
     def load_config(self):
         """
@@ -26,27 +79,34 @@ class Config:
         """
         default_config = {
             # 百度翻译API配置 - 从环境变量读取
-            'baidu_appid': os.getenv('BAIDU_APPID', ''),
-            'baidu_secret_key': os.getenv('BAIDU_SECRET_KEY', ''),
+            'baidu_appid': self._getenv('BAIDU_APPID'),
+            'baidu_secret_key': self._getenv('BAIDU_SECRET_KEY'),
             
             # OCR设置
             'ocr_language': 'japan',
+            
+            # Qwen翻译模型（Ollama模型名），显存/内存较小时可改用 qwen2.5:3b
+            'qwen_model': 'qwen2.5:7b',
+            
+            # 百度翻译并发请求数（标准版API限制QPS为1，高级版/尊享版可调高）
+            'baidu_max_workers': 1,
         }
         
         # 从config.json读取（可选）
-        if os.path.exists(self.config_file):
+        cache_key = self._cache_key()
+        self._loaded_key = cache_key
+        if cache_key is not None:
             try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    loaded_config = json.load(f)
-                    # config.json可以覆盖环境变量
-                    if 'baidu_appid' in loaded_config and loaded_config['baidu_appid']:
-                        default_config['baidu_appid'] = loaded_config['baidu_appid']
-                    if 'baidu_secret_key' in loaded_config and loaded_config['baidu_secret_key']:
-                        default_config['baidu_secret_key'] = loaded_config['baidu_secret_key']
-                    # 其他配置项
-                    for key in ['ocr_language']:
-                        if key in loaded_config:
-                            default_config[key] = loaded_config[key]
+                loaded_config = self._read_config_file(cache_key)
+                # config.json可以覆盖环境变量
+                if 'baidu_appid' in loaded_config and loaded_config['baidu_appid']:
+                    default_config['baidu_appid'] = loaded_config['baidu_appid']
+                if 'baidu_secret_key' in loaded_config and loaded_config['baidu_secret_key']:
+                    default_config['baidu_secret_key'] = loaded_config['baidu_secret_key']
+                # 其他配置项
+                for key in ['ocr_language', 'qwen_model', 'baidu_max_workers']:
+                    if key in loaded_config:
+                        default_config[key] = loaded_config[key]
             except Exception as e:
                 print(f"加载配置文件失败: {e}")
         
@@ -61,16 +121,32 @@ class Config:
     def save_config(self):
         """保存配置"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=4)
+            # 两种写法都使用2空格缩进（orjson只支持OPT_INDENT_2），保持文件格式一致
+            if orjson:
+                with open(self.config_file, 'wb') as f:
+                    f.write(orjson.dumps(self.config, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(self.config_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.config, f, ensure_ascii=False, indent=2)
+            self._dirty = False
+            self._loaded_key = self._cache_key()
+            if self._loaded_key is not None:
+                _CONFIG_CACHE[self._loaded_key] = dict(self.config)
         except Exception as e:
             print(f"保存配置文件失败: {e}")
     
+    def flush(self):
+        """将未保存的改动写入config.json（进程退出时自动调用）"""
+        if self._dirty:
+            self.save_config()
+    
     def get(self, key, default=None):
         """获取配置项"""
         return self.config.get(key, default)
     
     def set(self, key, value):
-        """设置配置项"""
+        """设置配置项（仅更新内存，调用flush()或进程退出时统一写入）"""
+        if key in self.config and self.config[key] == value:
+            return
         self.config[key] = value
-        self.save_config()
+        self._dirty = True
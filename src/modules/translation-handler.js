@@ -24,6 +24,29 @@ let requestQueue = [];
 /** @type {string} 缓存的stdout输出 */
 let stdoutBuffer = "";
 
+/**
+ * 将Python返回的列式文本块还原为对象数组
+ * @param {Object|Array} columns - {x: [], y: [], width: [], ...}
+ * @returns {Array<Object>} 文本块数组 [{x, y, width, height, original, translated, confidence}]
+ */
+function unpackTextBlocks(columns) {
+  if (!columns || Array.isArray(columns)) {
+    return columns;
+  }
+
+  const fields = Object.keys(columns);
+  const count = fields.length > 0 ? columns[fields[0]].length : 0;
+  const blocks = new Array(count);
+  for (let i = 0; i < count; i++) {
+    const block = {};
+    for (const field of fields) {
+      block[field] = columns[field][i];
+    }
+    blocks[i] = block;
+  }
+  return blocks;
+}
+
 /**
  * 启动常驻Python翻译服务
  */
@@ -62,6 +85,9 @@ function startPythonDaemon() {
 
       try {
         const result = JSON.parse(line);
+        if (result.textBlocks) {
+          result.textBlocks = unpackTextBlocks(result.textBlocks);
+        }
         const request = requestQueue.shift();
         if (request) {
           request.resolve(result);
@@ -4,16 +4,54 @@
 """
 import hashlib
 import random
+import threading
+from collections import OrderedDict
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 class BaiduTranslator:
     """百度翻译API"""
     
+    # 翻译结果LRU缓存的最大条目数
+    CACHE_SIZE = 512
+    
+    # 错误码说明
+    _ERROR_MESSAGES = {
+        '52001': 'TIMEOUT - 请求超时',
+        '52002': 'SYSTEM ERROR - 系统错误',
+        '52003': 'UNAUTHORIZED USER - 未授权用户',
+        '54000': 'REQUIRED PARAMETER IS NULL - 必填参数为空',
+        '54001': 'INVALID SIGN - 签名错误',
+        '54003': 'ACCESS FREQUENCY LIMITED - 访问频率受限',
+        '54004': 'INSUFFICIENT ACCOUNT BALANCE - 账户余额不足',
+        '54005': 'LONG QUERY TOO FREQUENTLY - 长查询请求过于频繁',
+        '58000': 'CLIENT_IP_ILLEGAL - 客户端IP非法',
+    }
+    
     def __init__(self, appid, secret_key):
         self.appid = appid
         self.secret_key = secret_key
         self.api_url = 'https://fanyi-api.baidu.com/api/trans/vip/translate'
+        # 签名 = md5(appid + q + salt + 密钥)，appid前缀的哈希状态只计算一次
+        self._md5_prefix = hashlib.md5((appid or '').encode('utf-8'), usedforsecurity=False)
+        self._secret_bytes = (secret_key or '').encode('utf-8')
+        # 复用HTTPS连接（keep-alive），避免每次翻译都重新握手
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        ))
+        # 翻译结果缓存：(文本, 源语言, 目标语言) -> 译文
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
     
     def translate(self, text, from_lang='jp', to_lang='zh'):
         """
@@ -33,10 +71,21 @@ class BaiduTranslator:
         if not text or not text.strip():
             return ""
         
+        # 重复文本直接返回缓存结果，跳过签名和网络请求
+        cache_key = (text.strip(), from_lang, to_lang)
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+        
         # 生成签名
         salt = str(random.randint(32768, 65536))
-        sign_str = f"{self.appid}{text}{salt}{self.secret_key}"
-        sign = hashlib.md5(sign_str.encode('utf-8')).hexdigest()
+        h = self._md5_prefix.copy()
+        h.update(text.encode('utf-8'))
+        h.update(salt.encode('ascii'))
+        h.update(self._secret_bytes)
+        sign = h.hexdigest()
         
         # 构建请求参数
         params = {
@@ -49,12 +98,17 @@ class BaiduTranslator:
         }
         
         try:
-            response = requests.get(self.api_url, params=params, timeout=5)
-            result = response.json()
+            response = self._session.get(self.api_url, params=params, timeout=5)
+            result = orjson.loads(response.content) if orjson else response.json()
             
             if 'trans_result' in result:
                 translations = [item['dst'] for item in result['trans_result']]
-                return '\n'.join(translations)
+                translated = '\n'.join(translations)
+                with self._cache_lock:
+                    self._cache[cache_key] = translated
+                    if len(self._cache) > self.CACHE_SIZE:
+                        self._cache.popitem(last=False)
+                return translated
             elif 'error_code' in result:
                 error_msg = self._get_error_message(result['error_code'])
                 return f"翻译错误: {error_msg}"
@@ -66,15 +120,4 @@ class BaiduTranslator:
     
     def _get_error_message(self, error_code):
         """获取错误信息"""
-        error_dict = {
-            '52001': 'TIMEOUT - 请求超时',
-            '52002': 'SYSTEM ERROR - 系统错误',
-            '52003': 'UNAUTHORIZED USER - 未授权用户',
-            '54000': 'REQUIRED PARAMETER IS NULL - 必填参数为空',
-            '54001': 'INVALID SIGN - 签名错误',
-            '54003': 'ACCESS FREQUENCY LIMITED - 访问频率受限',
-            '54004': 'INSUFFICIENT ACCOUNT BALANCE - 账户余额不足',
-            '54005': 'LONG QUERY TOO FREQUENTLY - 长查询请求过于频繁',
-            '58000': 'CLIENT_IP_ILLEGAL - 客户端IP非法',
-        }
-        return error_dict.get(str(error_code), f'未知错误码: {error_code}')
+        return self._ERROR_MESSAGES.get(str(error_code), f'未知错误码: {error_code}')
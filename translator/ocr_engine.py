@@ -2,31 +2,52 @@
 """
 OCR Engine - PaddleOCR for Japanese
 """
+import os
+import re
 import sys
-import numpy as np
-from PIL import Image
+import logging
+from collections import OrderedDict
 
-try:
-    from paddleocr import PaddleOCR
-    PADDLEOCR_AVAILABLE = True
-except ImportError:
-    PADDLEOCR_AVAILABLE = False
+logger = logging.getLogger("ocr_engine")
+
+# 日文字符（平假名、片假名、CJK统一汉字、半角片假名），翻译器也用它跳过非日文文本
+JAPANESE_RE = re.compile(r'[\u3040-\u30ff\u4e00-\u9fff\uff66-\uff9f]')
+
+# PaddleOCR（含paddlepaddle）导入开销较大，首次初始化引擎时才加载
+_PaddleOCR = None
+
+
+def _load_paddleocr():
+    """延迟导入PaddleOCR，未安装时返回None"""
+    global _PaddleOCR
+    if _PaddleOCR is None:
+        try:
+            from paddleocr import PaddleOCR
+        except ImportError:
+            return None
+        _PaddleOCR = PaddleOCR
+    return _PaddleOCR
 
 
 class OCREngine:
     """OCR Engine using PaddleOCR"""
     
+    # 识别结果缓存的最大条目数
+    RESULT_CACHE_SIZE = 8
+    
     def __init__(self, lang='japan', use_textline_orientation=True, confidence_threshold=0.5):
         """Initialize PaddleOCR engine"""
         self.lang = lang
         self.use_textline_orientation = use_textline_orientation
         self.confidence_threshold = confidence_threshold
         self.ocr = None
+        self._result_cache = OrderedDict()
         self._init_ocr()
     
     def _init_ocr(self):
         """Initialize PaddleOCR"""
-        if not PADDLEOCR_AVAILABLE:
+        PaddleOCR = _load_paddleocr()
+        if PaddleOCR is None:
             print(f"❌ PaddleOCR未安装", file=sys.stderr)
             print(f"   请运行: pip install paddleocr paddlepaddle", file=sys.stderr)
             return
@@ -50,97 +71,107 @@ class OCREngine:
         if self.ocr is None:
             return []
         
+        # 同一图像重复识别（如has_japanese_text后再recognize）时复用上次结果
+        key = self._image_cache_key(image)
+        if key is not None and key in self._result_cache:
+            self._result_cache.move_to_end(key)
+            return [dict(r) for r in self._result_cache[key]]
+        
+        try:
+            text_results = self._recognize(image)
+        except Exception as e:
+            logger.exception("OCR识别失败: %s", e)
+            return []
+        
+        if key is not None:
+            self._result_cache[key] = text_results
+            if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+            return [dict(r) for r in text_results]
+        return text_results
+    
+    def _image_cache_key(self, image):
+        """生成识别结果缓存键：只缓存文件路径(路径, mtime, 大小)，内存图像不缓存"""
+        if not isinstance(image, str):
+            return None
         try:
-            # 处理输入图像
-            if isinstance(image, str):
-                print(f"📂 加载图像: {image}", file=sys.stderr)
-                image_path = image
-                image = Image.open(image)
-                print(f"   图像大小: {image.size}", file=sys.stderr)
-            else:
-                image_path = None
+            st = os.stat(image)
+        except OSError:
+            return None
+        return (image, st.st_mtime_ns, st.st_size)
+    
+    def _recognize(self, image):
+        """执行OCR识别（无缓存）"""
+        import numpy as np
+        
+        # 处理输入图像
+        # 文件路径直接交给PaddleOCR解码，避免PIL先完整解码一次再转数组
+        if isinstance(image, str):
+            logger.debug("📂 加载图像: %s", image)
+        else:
+            from PIL import Image
             
             # 转换为numpy数组（PaddleOCR需要）
+            # PaddleOCR只读取输入，用asarray避免再复制一份像素缓冲区
             if isinstance(image, Image.Image):
-                image = np.array(image)
-            
-            print(f"🔍 使用PaddleOCR识别...", file=sys.stderr)
-            
-            # PaddleOCR识别（使用新API: predict）
-            result = self.ocr.predict(image)
-            
-            # 新版PaddleOCR返回字典格式
-            if not result or not isinstance(result, list) or len(result) == 0:
-                print(f"   ⚠️ 未识别到文本", file=sys.stderr)
-                return []
-            
-            # 获取第一个结果（字典格式）
-            ocr_result = result[0]
-            if not isinstance(ocr_result, dict):
-                print(f"   ⚠️ 结果格式错误", file=sys.stderr)
-                return []
-            
-            # 提取识别结果
-            rec_texts = ocr_result.get('rec_texts', [])
-            rec_scores = ocr_result.get('rec_scores', [])
-            rec_polys = ocr_result.get('rec_polys', [])
-            
-            if not rec_texts:
-                print(f"   ⚠️ 未识别到文本", file=sys.stderr)
-                return []
-            
-            # 解析结果
-            text_results = []
-            filtered_count = 0
-            
-            for idx, (text, confidence, box) in enumerate(zip(rec_texts, rec_scores, rec_polys)):
-                # 置信度过滤
-                if confidence < self.confidence_threshold:
-                    filtered_count += 1
-                    print(f"   [{idx+1}] {text} (置信度: {confidence:.2f}) ⚠️ 已过滤", file=sys.stderr)
-                    continue
-                
-                print(f"   [{idx+1}] {text} (置信度: {confidence:.2f})", file=sys.stderr)
-                
-                text_results.append({
-                    'text': text,
-                    'confidence': confidence,
-                    'box': box.tolist() if hasattr(box, 'tolist') else box
-                })
-            
-            if filtered_count > 0:
-                print(f"   ⚠️ 过滤了 {filtered_count} 个低置信度结果（< {self.confidence_threshold}）", file=sys.stderr)
-            
-            print(f"   识别到 {len(text_results)} 个文本块", file=sys.stderr)
-            
-            return text_results
+                image = np.asarray(image)
         
-        except Exception as e:
-            print(f"OCR识别失败: {e}", file=sys.stderr)
-            import traceback
-            traceback.print_exc(file=sys.stderr)
+        logger.debug("🔍 使用PaddleOCR识别...")
+        
+        # PaddleOCR识别（使用新API: predict）
+        result = self.ocr.predict(image)
+        
+        # 新版PaddleOCR返回字典格式
+        if not result or not isinstance(result, list) or len(result) == 0:
+            logger.debug("   ⚠️ 未识别到文本")
+            return []
+        
+        # 获取第一个结果（字典格式）
+        ocr_result = result[0]
+        if not isinstance(ocr_result, dict):
+            logger.warning("   ⚠️ 结果格式错误")
+            return []
+        
+        # 提取识别结果
+        rec_texts = ocr_result.get('rec_texts', [])
+        rec_scores = ocr_result.get('rec_scores', [])
+        rec_polys = ocr_result.get('rec_polys', [])
+        
+        if not rec_texts:
+            logger.debug("   ⚠️ 未识别到文本")
             return []
+        
+        # 逐块日志只在DEBUG级别开启时输出
+        if logger.isEnabledFor(logging.DEBUG):
+            for idx, (text, confidence) in enumerate(zip(rec_texts, rec_scores)):
+                if confidence < self.confidence_threshold:
+                    logger.debug("   [%d] %s (置信度: %.2f) ⚠️ 已过滤", idx + 1, text, confidence)
+                else:
+                    logger.debug("   [%d] %s (置信度: %.2f)", idx + 1, text, confidence)
+        
+        # 置信度过滤（NumPy向量化），只解析保留下来的文本块
+        scores = np.asarray(rec_scores, dtype=float)
+        keep = np.flatnonzero(scores >= self.confidence_threshold)
+        filtered_count = len(scores) - len(keep)
+        
+        # 解析结果
+        text_results = []
+        for idx in keep:
+            box = rec_polys[idx]
+            text_results.append({
+                'text': rec_texts[idx],
+                'confidence': float(scores[idx]),
+                'box': box.tolist() if hasattr(box, 'tolist') else box
+            })
+        
+        if filtered_count > 0:
+            logger.debug("   ⚠️ 过滤了 %d 个低置信度结果（< %s）", filtered_count, self.confidence_threshold)
+        
+        logger.debug("   识别到 %d 个文本块", len(text_results))
+        
+        return text_results
     
     def has_japanese_text(self, image):
         """Check if image contains Japanese text"""
-        results = self.recognize(image)
-        if not results:
-            return False
-        
-        # 检查所有识别的文本
-        for result in results:
-            text = result['text']
-            # 检查是否包含日文字符（平假名、片假名、汉字）
-            japanese_ranges = [
-                (0x3040, 0x309F),  # 平假名
-                (0x30A0, 0x30FF),  # 片假名
-                (0x4E00, 0x9FFF),  # CJK统一汉字
-            ]
-            
-            for char in text:
-                code = ord(char)
-                for start, end in japanese_ranges:
-                    if start <= code <= end:
-                        return True
-        
-        return False
+        # 检查是否包含日文字符（平假名、片假名、汉字）
+        return any(JAPANESE_RE.search(r['text']) for r in self.recognize(image))
@@ -2,20 +2,142 @@
 """
 Qwen Translator - Local translation via Ollama
 """
+import os
+import re
 import sys
 import json
-from typing import List, Dict, Optional
+import time
+import atexit
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
+from typing import Callable, List, Dict, Optional, Tuple
 
-try:
-    import ollama
-    OLLAMA_AVAILABLE = True
-except ImportError:
-    OLLAMA_AVAILABLE = False
+from .ocr_engine import JAPANESE_RE
+
+# 批量翻译结果中的编号行，如 "1. 翻译结果" / "1、翻译结果" / "1）翻译结果"
+# 第2组为分隔符后的空白，用于区分 "1.5倍" 之类的小数
+_NUMBERED_LINE_RE = re.compile(r'^\s*(\d+)\s*[.．)）、](\s*)(.+?)\s*$')
+
+# 提示词模板（开头, 结尾），按 fix_ocr 区分，原文拼接在中间
+_SINGLE_PROMPTS = {
+    True: (
+        "你是专业的日中翻译助手。请完成以下任务：\n"
+        "1. 识别并修正OCR可能产生的错误（如字符识别错误）\n"
+        "2. 将修正后的日语翻译成简体中文\n"
+        "3. 保持原文的语气和敬语\n"
+        "\n"
+        "原文：",
+        "\n"
+        "\n"
+        "重要：只输出翻译后的中文结果，不要添加任何括号注释、解释说明或其他额外内容。"
+    ),
+    False: (
+        "将以下日语翻译成简体中文，保持原文语气：\n"
+        "\n",
+        "\n"
+        "\n"
+        "重要：只输出翻译结果，不要添加任何解释或注释。"
+    ),
+}
+
+_BATCH_PROMPTS = {
+    True: (
+        "你是专业的日中翻译助手。请批量处理以下日语文本：\n"
+        "1. 识别并修正OCR可能产生的错误\n"
+        "2. 翻译成简体中文\n"
+        "3. 保持原文语气\n"
+        "\n"
+        "原文列表：\n",
+        "\n"
+        "\n"
+        "重要：请严格按照相同编号输出翻译结果，每行一个翻译，不要添加任何括号注释、解释说明或其他额外内容。\n"
+        "格式示例：\n"
+        "1. 翻译结果1\n"
+        "2. 翻译结果2"
+    ),
+    False: (
+        "将以下日语文本翻译成简体中文：\n"
+        "\n",
+        "\n"
+        "\n"
+        "重要：请严格按照相同编号输出翻译结果，每行一个翻译，不要添加任何解释或注释。"
+    ),
+}
+
+# 提示词模板的摘要，计入持久化缓存键，修改提示词后旧缓存自动失效
+_PROMPT_DIGEST = hashlib.blake2b(
+    repr((_SINGLE_PROMPTS, _BATCH_PROMPTS)).encode('utf-8'), digest_size=8
+).hexdigest()
+
+# ollama库在首次检查服务时才导入
+ollama = None
+
+
+def _load_ollama() -> bool:
+    """延迟导入ollama库，返回是否可用"""
+    global ollama
+    if ollama is None:
+        try:
+            import ollama as _ollama
+        except ImportError:
+            return False
+        ollama = _ollama
+    return True
+
+
+# ollama.list()结果缓存：(获取时间, 模型名列表)，多个实例共享
+_models_cache = None
+_MODELS_CACHE_TTL = 60
+
+
+def _num_parallel(default: int = 4) -> int:
+    """读取 OLLAMA_NUM_PARALLEL 作为并发请求数，未设置或不是正整数时使用默认值"""
+    try:
+        return max(1, int(os.getenv('OLLAMA_NUM_PARALLEL', '')))
+    except ValueError:
+        return default
+
+
+def _list_models() -> List[str]:
+    """获取Ollama已安装的模型列表（60秒内复用上次结果）"""
+    global _models_cache
+    now = time.monotonic()
+    if _models_cache is None or now - _models_cache[0] > _MODELS_CACHE_TTL:
+        models_response = ollama.list()
+        _models_cache = (now, [m.model for m in models_response.models])
+    return _models_cache[1]
 
 
 class QwenTranslator:
     """Qwen翻译器（通过Ollama）"""
     
+    # 批量翻译的并发请求数，与Ollama服务端的 OLLAMA_NUM_PARALLEL 保持一致
+    MAX_CONCURRENT_REQUESTS = _num_parallel()
+    # 文本块少于该数量时合并为一个提示词（上下文复用更划算）
+    MIN_PARALLEL_BATCH = 3
+    # 上下文窗口上下限，避免Ollama按模型最大上下文分配KV缓存
+    MIN_NUM_CTX = 512
+    MAX_NUM_CTX = 2048
+    # 最大生成token数：批量提示词 / 单条文本
+    BATCH_NUM_PREDICT = 512
+    SINGLE_NUM_PREDICT = 128
+    # 翻译结果LRU缓存的最大条目数
+    CACHE_SIZE = 1024
+    # 模型在Ollama中的驻留时间（默认5分钟后卸载，重新加载需要数秒）
+    KEEP_ALIVE = '1h'
+    # 请求超时（秒），长文本批量翻译可能需要较长时间
+    REQUEST_TIMEOUT = 300
+    # 持久化翻译缓存（跨进程复用，重启应用后仍然有效）
+    CACHE_DB_PATH = Path.home() / '.cache' / 'taro_translate' / 'cache.db'
+    # 持久化缓存的最大条目数，超出时删除最早写入的条目
+    CACHE_DB_MAX_ROWS = 50000
+    # 缓存版本，修改结果解析/清理逻辑后递增，使旧的持久化缓存失效
+    CACHE_VERSION = 3
+    
     def __init__(self, model='qwen2.5:7b'):
         """
         初始化Qwen翻译器
@@ -24,22 +146,33 @@ class QwenTranslator:
             model: Ollama模型名称，默认qwen2.5:7b
         """
         self.model = model
+        self._cache = OrderedDict()
+        self._db = self._open_cache_db()
+        self._client = None
         self.available = self._check_ollama()
+        
+        # 进程退出时关闭缓存数据库
+        atexit.register(self.close)
     
     def _check_ollama(self) -> bool:
         """检查Ollama服务是否可用"""
-        if not OLLAMA_AVAILABLE:
+        if not _load_ollama():
             print(f"⚠️ Ollama Python库未安装", file=sys.stderr)
             print(f"   请运行: pip install ollama", file=sys.stderr)
             return False
         
+        # 复用同一个HTTP客户端（连接池 + keep-alive），单条/合并/并发请求共享连接
+        # 客户端与进程同生命周期，不单独关闭
+        self._client = ollama.Client(timeout=self.REQUEST_TIMEOUT)
+        
         try:
             # 检查模型是否存在
-            models_response = ollama.list()
-            model_names = [m.model for m in models_response.models]
+            model_names = _list_models()
             
             if self.model in model_names:
                 print(f"✅ Qwen翻译器可用 (模型: {self.model})", file=sys.stderr)
+                # 后台预加载模型，避免首次翻译时等待模型加载
+                threading.Thread(target=self._warm_up, daemon=True).start()
                 return True
             else:
                 print(f"⚠️ 未找到模型: {self.model}", file=sys.stderr)
@@ -51,50 +184,177 @@ class QwenTranslator:
             traceback.print_exc(file=sys.stderr)
             return False
     
-    def _call_ollama(self, prompt: str) -> Optional[str]:
+    def _warm_up(self) -> None:
+        """预加载模型到Ollama（只生成1个token）"""
+        try:
+            self._client.generate(
+                model=self.model,
+                prompt='',
+                keep_alive=self.KEEP_ALIVE,
+                options={'num_predict': 1}
+            )
+        except Exception as e:
+            print(f"⚠️ Qwen模型预加载失败: {e}", file=sys.stderr)
+    
+    def _call_ollama(self, prompt: str,
+                     on_token: Optional[Callable[[str], None]] = None,
+                     num_predict: int = BATCH_NUM_PREDICT) -> Tuple[Optional[str], bool]:
         """
-        调用Ollama API（使用官方Python库）
+        调用Ollama API（使用官方Python库，流式接收）
         
         Args:
             prompt: 提示词
+            on_token: 可选回调，每收到一段生成文本时调用（用于显示部分结果）
+            num_predict: 最大生成token数
         
         Returns:
-            生成的文本，失败返回None
+            (生成的文本, 是否完整)，失败时文本为None；
+            达到num_predict上限被截断时不完整
         """
         try:
-            response = ollama.chat(
+            stream = self._client.chat(
                 model=self.model,
                 messages=[{
                     'role': 'user',
                     'content': prompt
-                }]
+                }],
+                stream=True,
+                keep_alive=self.KEEP_ALIVE,
+                options=self._chat_options(prompt, num_predict)
             )
             
-            return response['message']['content'].strip()
+            parts = []
+            done_reason = None
+            for chunk in stream:
+                token = chunk['message']['content']
+                parts.append(token)
+                if on_token is not None:
+                    on_token(token)
+                done_reason = chunk.get('done_reason')
+            
+            return ''.join(parts).strip(), done_reason != 'length'
         except Exception as e:
             print(f"❌ Ollama调用失败: {e}", file=sys.stderr)
+            return None, False
+    
+    def close(self) -> None:
+        """关闭翻译缓存数据库"""
+        if self._db is not None:
+            self._prune_cache_db(self._db)
+            self._db.close()
+            self._db = None
+    
+    def _open_cache_db(self) -> Optional[sqlite3.Connection]:
+        """打开持久化翻译缓存，失败时只使用内存缓存"""
+        try:
+            self.CACHE_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.CACHE_DB_PATH), isolation_level=None, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS translations '
+                '(hash BLOB PRIMARY KEY, translation TEXT NOT NULL)'
+            )
+            self._prune_cache_db(db)
+            return db
+        except Exception as e:
+            print(f"⚠️ 翻译缓存数据库不可用: {e}", file=sys.stderr)
+            return None
+    
+    def _prune_cache_db(self, db: sqlite3.Connection) -> None:
+        """删除超出 CACHE_DB_MAX_ROWS 的最早写入的条目（rowid按写入顺序递增）"""
+        try:
+            db.execute(
+                'DELETE FROM translations WHERE rowid <= '
+                '(SELECT MAX(rowid) FROM translations) - ?',
+                (self.CACHE_DB_MAX_ROWS,)
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️ 清理翻译缓存失败: {e}", file=sys.stderr)
+    
+    def _db_key(self, text: str, fix_ocr: bool) -> bytes:
+        """持久化缓存键：缓存版本、提示词、模型、修正模式和原文的哈希"""
+        raw = f"{self.CACHE_VERSION}\0{_PROMPT_DIGEST}\0{self.model}\0{int(fix_ocr)}\0{text}".encode('utf-8')
+        return hashlib.blake2b(raw, digest_size=16).digest()
+    
+    def _cache_get(self, text: str, fix_ocr: bool) -> Optional[str]:
+        """查询翻译缓存（先内存LRU，再持久化缓存），未命中返回None"""
+        key = (text.strip(), fix_ocr)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+        
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                'SELECT translation FROM translations WHERE hash = ?',
+                (self._db_key(key[0], fix_ocr),)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
             return None
+        self._remember(key, row[0])
+        return row[0]
+    
+    def _cache_put(self, text: str, fix_ocr: bool, translation: str) -> None:
+        """写入翻译缓存（失败或不完整的结果不缓存）"""
+        if not translation or translation.startswith('翻译失败') or translation == '翻译结果不完整':
+            return
+        key = (text.strip(), fix_ocr)
+        self._remember(key, translation)
+        
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                'INSERT OR REPLACE INTO translations (hash, translation) VALUES (?, ?)',
+                (self._db_key(key[0], fix_ocr), translation)
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️ 写入翻译缓存失败: {e}", file=sys.stderr)
+    
+    def _remember(self, key, translation: str) -> None:
+        """写入内存LRU缓存"""
+        self._cache[key] = translation
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+    
+    def _chat_options(self, prompt: str, num_predict: int) -> Dict:
+        """根据提示词长度生成请求参数（按需分配上下文窗口）"""
+        # 日文/中文大约每个字符一个token，另外预留输出空间
+        needed = len(prompt) + num_predict
+        return {
+            'num_ctx': min(self.MAX_NUM_CTX, max(self.MIN_NUM_CTX, needed)),
+            'num_predict': num_predict,
+            'temperature': 0,
+            'top_p': 0.9
+        }
     
     def _clean_translation(self, text: str) -> str:
         """清理翻译结果，只处理明显的后缀解释"""
         # 只处理省略号后跟随的明显解释文本
         # 例如："自动... 解释内容" -> "自动"
         # 但保留原文中正常的省略号
-        if '...' in text:
-            parts = text.split('...')
-            # 如果省略号后面有明显的解释性文字（较长），则截断
-            if len(parts) > 1 and len(parts[1]) > 5:
-                text = parts[0]
+        head, sep, tail = text.partition('...')
+        # 如果省略号后面有明显的解释性文字（较长），则截断
+        if sep and len(tail.partition('...')[0]) > 5:
+            text = head
         
         return text.strip()
     
-    def translate(self, text: str, fix_ocr=True) -> str:
+    def translate(self, text: str, fix_ocr=True,
+                  on_token: Optional[Callable[[str], None]] = None) -> str:
         """
         翻译单个文本
         
         Args:
             text: 要翻译的日语文本
             fix_ocr: 是否启用OCR错误修正
+            on_token: 可选回调，流式接收生成中的翻译片段
         
         Returns:
             翻译后的中文
@@ -105,35 +365,40 @@ class QwenTranslator:
         if not text or not text.strip():
             return ""
         
-        # 构建提示词
-        if fix_ocr:
-            prompt = f"""你是专业的日中翻译助手。请完成以下任务：
-1. 识别并修正OCR可能产生的错误（如字符识别错误）
-2. 将修正后的日语翻译成简体中文
-3. 保持原文的语气和敬语
-
-原文：{text}
-
-重要：只输出翻译后的中文结果，不要添加任何括号注释、解释说明或其他额外内容。"""
-        else:
-            prompt = f"""将以下日语翻译成简体中文，保持原文语气：
-
-{text}
-
-重要：只输出翻译结果，不要添加任何解释或注释。"""
+        # 不含日文的文本无需翻译
+        if not JAPANESE_RE.search(text):
+            return text
+        
+        cached = self._cache_get(text, fix_ocr)
+        if cached is not None:
+            return cached
         
-        result = self._call_ollama(prompt)
+        result, complete = self._call_ollama(
+            self._build_prompt(text, fix_ocr), on_token, self.SINGLE_NUM_PREDICT
+        )
         if result:
             result = self._clean_translation(result)
-        return result if result else f"翻译失败: {text}"
+        if not result:
+            return f"翻译失败: {text}"
+        # 被截断的结果不缓存
+        if complete:
+            self._cache_put(text, fix_ocr, result)
+        return result
     
-    def translate_batch(self, texts: List[str], fix_ocr=True) -> List[str]:
+    def _build_prompt(self, text: str, fix_ocr: bool) -> str:
+        """构建单条文本的翻译提示词"""
+        head, tail = _SINGLE_PROMPTS[fix_ocr]
+        return ''.join((head, text, tail))
+    
+    def translate_batch(self, texts: List[str], fix_ocr=True,
+                        on_token: Optional[Callable[[str], None]] = None) -> List[str]:
         """
         批量翻译（优化性能）
         
         Args:
             texts: 要翻译的日语文本列表
             fix_ocr: 是否启用OCR错误修正
+            on_token: 可选回调，流式接收生成的文本片段（并发模式下每完成一条回调一次 "编号. 译文\n"）
         
         Returns:
             翻译后的中文列表
@@ -149,70 +414,146 @@ class QwenTranslator:
         if not non_empty_texts:
             return [""] * len(texts)
         
+        # 先查缓存，只翻译未命中的文本
+        # 纯数字/英文等不含日文的文本（如HP、时间、按钮标签）原样返回
+        final_results = [""] * len(texts)
+        misses = []
+        for orig_idx, text in non_empty_texts:
+            if not JAPANESE_RE.search(text):
+                final_results[orig_idx] = text
+                continue
+            cached = self._cache_get(text, fix_ocr)
+            if cached is None:
+                misses.append((orig_idx, text))
+            else:
+                final_results[orig_idx] = cached
+        
+        if not misses:
+            return final_results
+        
+        # 相同文本只翻译一次（如重复出现的按钮、标签）
+        unique_texts = list(dict.fromkeys(t.strip() for _, t in misses))
+        translations, complete = self._translate_uncached(unique_texts, fix_ocr, on_token)
+        mapping = dict(zip(unique_texts, translations))
+        # 被截断的结果不缓存
+        for text, trans, ok in zip(unique_texts, translations, complete):
+            if ok:
+                self._cache_put(text, fix_ocr, trans)
+        
+        # 将翻译结果映射回原始位置
+        for orig_idx, text in misses:
+            final_results[orig_idx] = mapping[text.strip()]
+        
+        return final_results
+    
+    def _translate_uncached(self, texts: List[str], fix_ocr: bool,
+                            on_token: Optional[Callable[[str], None]] = None
+                            ) -> Tuple[List[str], List[bool]]:
+        """
+        翻译未命中缓存的文本
+        
+        Args:
+            texts: 非空的日语文本列表
+            fix_ocr: 是否启用OCR错误修正
+            on_token: 可选回调，流式接收生成的文本片段（并发模式下按完成顺序逐条回调）
+        
+        Returns:
+            (与texts一一对应的翻译列表, 每项是否完整)
+        """
+        # 文本块较多时逐条并发请求，由Ollama并行调度
+        if len(texts) >= self.MIN_PARALLEL_BATCH:
+            return self._translate_batch_parallel(texts, fix_ocr, on_token)
+        
         # 构建批量翻译提示词
-        numbered_texts = "\n".join([f"{i+1}. {t}" for i, t in non_empty_texts])
+        numbered_texts = "\n".join(map("{}. {}".format, range(1, len(texts) + 1), texts))
         
-        if fix_ocr:
-            prompt = f"""你是专业的日中翻译助手。请批量处理以下日语文本：
-1. 识别并修正OCR可能产生的错误
-2. 翻译成简体中文
-3. 保持原文语气
-
-原文列表：
-{numbered_texts}
-
-重要：请严格按照相同编号输出翻译结果，每行一个翻译，不要添加任何括号注释、解释说明或其他额外内容。
-格式示例：
-1. 翻译结果1
-2. 翻译结果2"""
-        else:
-            prompt = f"""将以下日语文本翻译成简体中文：
-
-{numbered_texts}
-
-重要：请严格按照相同编号输出翻译结果，每行一个翻译，不要添加任何解释或注释。"""
+        head, tail = _BATCH_PROMPTS[fix_ocr]
+        prompt = ''.join((head, numbered_texts, tail))
         
-        result = self._call_ollama(prompt)
+        result, complete = self._call_ollama(prompt, on_token)
         
         if not result:
-            return [f"翻译失败: {t}" for _, t in non_empty_texts]
+            return [f"翻译失败: {t}" for t in texts], [False] * len(texts)
         
         # 解析结果
-        translations = self._parse_batch_result(result, len(non_empty_texts))
+        return self._parse_batch_result(result, len(texts)), [complete] * len(texts)
+    
+    def _translate_batch_parallel(self, texts: List[str], fix_ocr: bool,
+                                  on_token: Optional[Callable[[str], None]] = None
+                                  ) -> Tuple[List[str], List[bool]]:
+        """
+        并发翻译多个文本（每个文本独立请求，线程池共享同一个HTTP客户端）
         
-        # 将翻译结果映射回原始位置
-        final_results = [""] * len(texts)
-        for (orig_idx, _), trans in zip(non_empty_texts, translations):
-            final_results[orig_idx] = trans
+        Args:
+            texts: 非空的日语文本列表
+            fix_ocr: 是否启用OCR错误修正
+            on_token: 可选回调，每完成一条时以 "编号. 译文\n" 的形式调用（按完成顺序）
         
-        return final_results
+        Returns:
+            (与texts一一对应的翻译列表, 每项是否完整)，失败项为"翻译失败: 原文"
+        """
+        def translate_one(text: str) -> Tuple[str, bool]:
+            prompt = self._build_prompt(text, fix_ocr)
+            try:
+                response = self._client.chat(
+                    model=self.model,
+                    messages=[{
+                        'role': 'user',
+                        'content': prompt
+                    }],
+                    keep_alive=self.KEEP_ALIVE,
+                    options=self._chat_options(prompt, self.SINGLE_NUM_PREDICT)
+                )
+            except Exception as e:
+                print(f"❌ Ollama调用失败: {e}", file=sys.stderr)
+                return f"翻译失败: {text}", False
+            result = self._clean_translation(response['message']['content'].strip())
+            if not result:
+                return f"翻译失败: {text}", False
+            return result, response.get('done_reason') != 'length'
+        
+        translations = [None] * len(texts)
+        complete = [False] * len(texts)
+        workers = min(self.MAX_CONCURRENT_REQUESTS, len(texts))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(translate_one, t): i for i, t in enumerate(texts)}
+            # 在调用线程中逐条回调，先完成的文本块先输出
+            for future in as_completed(futures):
+                i = futures[future]
+                translations[i], complete[i] = future.result()
+                if on_token is not None:
+                    on_token(f"{i + 1}. {translations[i]}\n")
+        return translations, complete
     
     def _parse_batch_result(self, result: str, expected_count: int) -> List[str]:
         """解析批量翻译结果"""
-        translations = []
-        lines = result.strip().split('\n')
+        translations = [None] * expected_count
+        unnumbered = []
+        next_slot = 0
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # 尝试匹配 "1. 翻译结果" 格式
-            if line[0].isdigit() and '. ' in line:
-                # 移除编号
-                _, trans = line.split('. ', 1)
-                trans = self._clean_translation(trans.strip())
-                translations.append(trans)
-            elif line:
-                # 如果没有编号，直接添加
-                trans = self._clean_translation(line)
-                translations.append(trans)
-        
-        # 确保返回正确数量的翻译
-        if len(translations) < expected_count:
-            translations.extend(["翻译结果不完整"] * (expected_count - len(translations)))
-        
-        return translations[:expected_count]
+        for line in result.strip().split('\n'):
+            # 匹配编号行，按编号放入对应位置（兼容乱序输出）
+            m = _NUMBERED_LINE_RE.match(line)
+            if m:
+                slot = int(m.group(1)) - 1
+                # 分隔符后紧跟数字（如 "1.5倍"）时可能是小数：只有前面已出现编号行、
+                # 且编号正好是下一个序号时才视为编号行，否则按无编号文本处理
+                if not m.group(2) and m.group(3)[0].isdigit() and (next_slot == 0 or slot != next_slot):
+                    m = None
+            if m:
+                if 0 <= slot < expected_count and translations[slot] is None:
+                    translations[slot] = self._clean_translation(m.group(3))
+                    next_slot = slot + 1
+            elif line.strip():
+                unnumbered.append(self._clean_translation(line))
+        
+        # 没有编号的行按顺序填入缺失的位置
+        missing = (i for i, t in enumerate(translations) if t is None)
+        for i, text in zip(missing, unnumbered):
+            translations[i] = text
+        
+        # 仍缺失的编号标记为不完整
+        return [t if t is not None else "翻译结果不完整" for t in translations]
     
     def fix_and_translate(self, ocr_results: List[Dict]) -> List[Dict]:
         """
@@ -222,7 +563,7 @@ class QwenTranslator:
             ocr_results: OCR识别结果列表，每项包含 {text, confidence, box}
         
         Returns:
-            修正并翻译后的结果列表
+            修正并翻译后的新结果列表（每项增加 translated，不修改传入的ocr_results）
         """
         if not self.available or not ocr_results:
             return ocr_results
@@ -234,7 +575,7 @@ class QwenTranslator:
         translations = self.translate_batch(texts, fix_ocr=True)
         
         # 合并结果
-        for result, translation in zip(ocr_results, translations):
-            result['translated'] = translation
-        
-        return ocr_results
+        return [
+            {**result, 'translated': translation}
+            for result, translation in zip(ocr_results, translations)
+        ]
@@ -4,35 +4,43 @@
 翻译服务 - 常驻服务模式
 
 本模块提供OCR识别和翻译服务，使用单例模式缓存实例以提升性能。
-启动后保持运行，接收命令行参数处理翻译请求。
+常驻模式下进程只启动一次，从stdin逐行读取JSON请求，向stdout逐行输出JSON结果。
 
 性能优化：
 - 首次调用：5-8秒（初始化OCR引擎）
 - 后续调用：1-2秒（使用缓存的实例）
 
 使用方法：
+    # 常驻模式（Electron使用）
+    python translate_service_server.py --daemon
+
+    # 单次模式（兼容旧版本，每次调用都会重新初始化）
     python translate_service_server.py <screenshot_path> <x> <y> <width> <height>
 
-输出格式（JSON）：
+输出格式（JSON，textBlocks按字段列存储，第i个文本块由各列的第i项组成）：
     {
         "success": true,
-        "textBlocks": [
-            {
-                "x": 10, "y": 20, "width": 100, "height": 30,
-                "original": "こんにちは",
-                "translated": "你好",
-                "confidence": 0.99
-            }
-        ]
+        "textBlocks": {
+            "x": [10], "y": [20], "width": [100], "height": [30],
+            "original": ["こんにちは"],
+            "translated": ["你好"],
+            "confidence": [0.99]
+        }
     }
 """
 
 import sys
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 添加项目根目录到Python路径
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -51,6 +59,9 @@ ocr: Optional[OCREngine] = None
 qwen_translator: Optional[QwenTranslator] = None
 baidu_translator: Optional[BaiduTranslator] = None
 
+# 输出文本块的字段（按列存储，序列化时每个字段只有一个数组）
+TEXT_BLOCK_FIELDS = ('x', 'y', 'width', 'height', 'original', 'translated', 'confidence')
+
 def init_services() -> None:
     """
     初始化所有服务（单例模式）
@@ -59,6 +70,7 @@ def init_services() -> None:
     - 优先使用Qwen本地翻译器（速度快、质量高、支持OCR修正）
     - 降级到百度API（Qwen不可用时）
     - OCR引擎启用MPS GPU加速和图像预处理
+    - OCR引擎与Qwen翻译器在后台线程并行初始化
     
     全局变量：
         config: 配置管理器
@@ -73,35 +85,78 @@ def init_services() -> None:
         print("🔧 初始化配置...", file=sys.stderr, flush=True)
         config = Config()
     
-    # 初始化Qwen翻译器（优先）
-    if qwen_translator is None:
-        print("🔧 初始化Qwen翻译器...", file=sys.stderr, flush=True)
-        qwen_translator = QwenTranslator()
-        if qwen_translator.available:
-            print("✅ Qwen翻译器就绪（主翻译引擎）", file=sys.stderr, flush=True)
+    # 所有服务都已初始化时直接复用，不必为每个请求创建线程池
+    if ocr is not None and qwen_translator is not None and baidu_translator is not None:
+        print("⚡ 使用缓存的OCR引擎（快速模式）", file=sys.stderr, flush=True)
+        return
+    
+    # OCR模型加载和Qwen检查/预热互不依赖，放到后台线程并行初始化
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        ocr_future = None
+        if ocr is None:
+            print("🔧 初始化OCR引擎...", file=sys.stderr, flush=True)
+            ocr_future = executor.submit(
+                OCREngine,
+                lang='japan',
+                use_textline_orientation=True,
+                confidence_threshold=0.5
+            )
         else:
-            print("⚠️ Qwen翻译器不可用，将使用百度API", file=sys.stderr, flush=True)
+            print("⚡ 使用缓存的OCR引擎（快速模式）", file=sys.stderr, flush=True)
+        
+        qwen_future = None
+        if qwen_translator is None:
+            print("🔧 初始化Qwen翻译器...", file=sys.stderr, flush=True)
+            qwen_future = executor.submit(QwenTranslator, model=config.get('qwen_model'))
+        
+        # 初始化百度翻译（降级方案）
+        if baidu_translator is None:
+            print("🔧 初始化百度翻译...", file=sys.stderr, flush=True)
+            baidu_translator = BaiduTranslator(
+                appid=config.get('baidu_appid'),
+                secret_key=config.get('baidu_secret_key')
+            )
+            print("✅ 百度翻译就绪（备用翻译引擎）", file=sys.stderr, flush=True)
+        
+        # 等待Qwen翻译器（优先）
+        if qwen_future is not None:
+            qwen_translator = qwen_future.result()
+            if qwen_translator.available:
+                print("✅ Qwen翻译器就绪（主翻译引擎）", file=sys.stderr, flush=True)
+            else:
+                print("⚠️ Qwen翻译器不可用，将使用百度API", file=sys.stderr, flush=True)
+        
+        # 等待OCR引擎（PaddleOCR）
+        if ocr_future is not None:
+            ocr = ocr_future.result()
+            print("✅ OCR引擎就绪", file=sys.stderr, flush=True)
+
+
+def _stream_line_logger():
+    """
+    创建流式输出回调：按行把已生成完的翻译结果输出到stderr
     
-    # 初始化百度翻译（降级方案）
-    if baidu_translator is None:
-        print("🔧 初始化百度翻译...", file=sys.stderr, flush=True)
-        baidu_translator = BaiduTranslator(
-            appid=config.get('baidu_appid'),
-            secret_key=config.get('baidu_secret_key')
-        )
-        print("✅ 百度翻译就绪（备用翻译引擎）", file=sys.stderr, flush=True)
+    返回：
+        接收文本片段的回调函数
+    """
+    pending = []
     
-    # 初始化OCR引擎（PaddleOCR）
-    if ocr is None:
-        print("🔧 初始化OCR引擎...", file=sys.stderr, flush=True)
-        ocr = OCREngine(
-            lang='japan',
-            use_textline_orientation=True,
-            confidence_threshold=0.5
-        )
-        print("✅ OCR引擎就绪", file=sys.stderr, flush=True)
-    else:
-        print("⚡ 使用缓存的OCR引擎（快速模式）", file=sys.stderr, flush=True)
+    def on_token(token: str) -> None:
+        pending.append(token)
+        if '\n' not in token:
+            return
+        *lines, rest = ''.join(pending).split('\n')
+        pending[:] = [rest]
+        for line in lines:
+            if line.strip():
+                print(f"   ⏩ {line.strip()}", file=sys.stderr, flush=True)
+    
+    return on_token
+
+
+def _empty_text_blocks() -> Dict[str, List[Any]]:
+    """创建空的列式文本块结果"""
+    return {field: [] for field in TEXT_BLOCK_FIELDS}
 
 
 def translate_region(
@@ -110,7 +165,7 @@ def translate_region(
     region_y: int,
     region_width: int,
     region_height: int
-) -> List[Dict[str, Any]]:
+) -> Dict[str, List[Any]]:
     """
     翻译指定区域的截图
     
@@ -128,7 +183,7 @@ def translate_region(
         region_height: 区域高度（像素）
     
     返回：
-        文本块列表，每个文本块包含：
+        列式文本块结果（各字段为等长列表，下标相同的项属于同一文本块）：
         - x, y: 文本块在截图中的相对坐标
         - width, height: 文本块尺寸
         - original: 原始日语文本
@@ -141,22 +196,22 @@ def translate_region(
         
         # OCR识别（PaddleOCR自动检测多文本块）
         print(f"🔍 开始OCR识别...", file=sys.stderr, flush=True)
-        start_time = __import__('time').time()
+        start_time = time.perf_counter()
         
         result = ocr.recognize(screenshot_path)
         
-        ocr_time = __import__('time').time() - start_time
+        ocr_time = time.perf_counter() - start_time
         print(f"✅ OCR完成 ({ocr_time:.2f}s)", file=sys.stderr, flush=True)
         
         if not result:
             print(f"⚠️ 未识别到文本", file=sys.stderr, flush=True)
-            return []
+            return _empty_text_blocks()
         
         print(f"✅ 识别到 {len(result)} 个文本块（已过滤低置信度）", file=sys.stderr, flush=True)
         
         # 批量翻译优化
         print(f"🌐 开始翻译 ({len(result)} 个文本块)...", file=sys.stderr, flush=True)
-        trans_start = __import__('time').time()
+        trans_start = time.perf_counter()
         
         translations = []
         
@@ -165,7 +220,9 @@ def translate_region(
             print(f"   使用Qwen翻译器（批量模式 + OCR修正）", file=sys.stderr, flush=True)
             texts = [item['text'] for item in result]
             try:
-                translations = qwen_translator.translate_batch(texts, fix_ocr=True)
+                translations = qwen_translator.translate_batch(
+                    texts, fix_ocr=True, on_token=_stream_line_logger()
+                )
                 # 检查是否有翻译失败
                 failed_count = sum(1 for t in translations if t.startswith('翻译失败'))
                 if failed_count > 0:
@@ -174,46 +231,46 @@ def translate_region(
                 print(f"⚠️ Qwen翻译失败，降级到百度翻译: {e}", file=sys.stderr, flush=True)
                 translations = []
         
-        # 降级到百度API（逐个翻译）
+        # 降级到百度API（多线程并发逐个翻译，map保持原顺序）
         if not translations or any(t.startswith('翻译失败') for t in translations):
-            print(f"   使用百度翻译API（逐个模式）", file=sys.stderr, flush=True)
-            translations = []
-            for item in result:
-                trans = baidu_translator.translate(item['text'])
-                translations.append(trans)
+            print(f"   使用百度翻译API（并发模式）", file=sys.stderr, flush=True)
+            # 并发数由config.json的baidu_max_workers控制（默认1，符合标准版QPS限制）
+            max_workers = max(1, int(config.get('baidu_max_workers') or 1))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                translations = list(executor.map(
+                    baidu_translator.translate, [item['text'] for item in result]
+                ))
         
-        trans_time = __import__('time').time() - trans_start
+        trans_time = time.perf_counter() - trans_start
         print(f"✅ 翻译完成 ({trans_time:.2f}s)", file=sys.stderr, flush=True)
         
         # 构建结果
-        text_blocks = []
+        text_blocks = _empty_text_blocks()
+        xs, ys = text_blocks['x'], text_blocks['y']
+        widths, heights = text_blocks['width'], text_blocks['height']
+        originals, translated_texts = text_blocks['original'], text_blocks['translated']
+        confidences = text_blocks['confidence']
         for item, translated in zip(result, translations):
             boxes = item['box']
             text = item['text']
             confidence = item['confidence']
             
-            # 计算边界
-            x_coords = [point[0] for point in boxes]
-            y_coords = [point[1] for point in boxes]
-            
-            x = int(min(x_coords))
-            y = int(min(y_coords))
-            width = int(max(x_coords) - min(x_coords))
-            height = int(max(y_coords) - min(y_coords))
+            # 计算边界（每个方向只求一次min/max）
+            x_coords, y_coords = zip(*boxes)
+            x_min = min(x_coords)
+            y_min = min(y_coords)
             
             print(f"   {text[:30]}... → {translated[:30]}...", file=sys.stderr, flush=True)
             
-            text_blocks.append({
-                'x': x,
-                'y': y,
-                'width': width,
-                'height': height,
-                'original': text,
-                'translated': translated,
-                'confidence': confidence
-            })
+            xs.append(int(x_min))
+            ys.append(int(y_min))
+            widths.append(int(max(x_coords) - x_min))
+            heights.append(int(max(y_coords) - y_min))
+            originals.append(text)
+            translated_texts.append(translated)
+            confidences.append(confidence)
         
-        total_time = __import__('time').time() - start_time
+        total_time = time.perf_counter() - start_time
         print(f"✅ 全部完成！总耗时 {total_time:.2f}s (OCR: {ocr_time:.2f}s, 翻译: {trans_time:.2f}s)", file=sys.stderr, flush=True)
         
         return text_blocks
@@ -222,12 +279,26 @@ def translate_region(
         print(f"❌ 翻译失败: {str(e)}", file=sys.stderr, flush=True)
         import traceback
         traceback.print_exc(file=sys.stderr)
-        return []
+        return _empty_text_blocks()
 
 # ============================================================================
 # 主程序入口
 # ============================================================================
 
+def _write_json(result: Dict[str, Any]) -> None:
+    """
+    输出一行JSON结果到stdout（供Electron读取）
+    
+    优先使用orjson直接写入字节（非ASCII字符原样输出，与ensure_ascii=False一致）
+    """
+    if orjson is None:
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+        return
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(result) + b"\n")
+    sys.stdout.buffer.flush()
+
+
 def run_daemon_mode():
     """
     常驻服务模式 - 持续监听stdin接收翻译请求
@@ -236,7 +307,8 @@ def run_daemon_mode():
         - 输入：每行一个JSON请求，格式如下：
           {"screenshot_path": "...", "x": 0, "y": 0, "width": 100, "height": 100}
         - 输出：每行一个JSON响应，格式如下：
-          {"success": true, "textBlocks": [...]}
+          {"success": true, "textBlocks": {"x": [...], "y": [...], ..., "confidence": [...]}}
+          textBlocks按字段列存储（见模块文档），Electron端用unpackTextBlocks还原为对象数组
     
     优势：
         - 进程只启动一次，所有服务实例缓存复用
@@ -273,14 +345,14 @@ def run_daemon_mode():
                 'success': True,
                 'textBlocks': text_blocks
             }
-            print(json.dumps(result, ensure_ascii=False), flush=True)
+            _write_json(result)
             
         except json.JSONDecodeError as e:
             error_result = {'success': False, 'error': f'JSON解析失败: {str(e)}'}
-            print(json.dumps(error_result, ensure_ascii=False), flush=True)
+            _write_json(error_result)
         except Exception as e:
             error_result = {'success': False, 'error': f'处理请求失败: {str(e)}'}
-            print(json.dumps(error_result, ensure_ascii=False), flush=True)
+            _write_json(error_result)
 
 
 def run_single_mode():
@@ -290,7 +362,7 @@ def run_single_mode():
     # 检查命令行参数
     if len(sys.argv) < 6:
         error_result = {'error': '参数不足，需要5个参数：screenshot_path x y width height'}
-        print(json.dumps(error_result, ensure_ascii=False), flush=True)
+        _write_json(error_result)
         sys.exit(1)
     
     # 解析命令行参数
@@ -314,7 +386,7 @@ def run_single_mode():
         'success': True,
         'textBlocks': text_blocks
     }
-    print(json.dumps(result, ensure_ascii=False), flush=True)
+    _write_json(result)
 
 
 if __name__ == '__main__':